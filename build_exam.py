@@ -1,65 +1,322 @@
 #!/usr/bin/env python3
 import argparse
+import glob
+import hashlib
+import io
 import json
+import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Optional fast JSON parser (stdlib json.loads also accepts UTF-8 bytes)
+try:
+    from orjson import loads as json_loads
+except Exception:
+    json_loads = json.loads
+
+# Optional validation (fastest available backend wins)
+try:
+    import jsonschema_rs  # Rust-backed, Draft 2020-12
+except Exception:
+    jsonschema_rs = None
+
+try:
+    import fastjsonschema  # generates Python code per schema
+except Exception:
+    fastjsonschema = None
 
-# Optional validation
 try:
     from jsonschema import Draft202012Validator
-    HAS_JSONSCHEMA = True
 except Exception:
-    HAS_JSONSCHEMA = False
+    Draft202012Validator = None
+
+# Optional file watching for --watch (falls back to polling mtimes)
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except Exception:
+    FileSystemEventHandler = object
+    Observer = None
+
+HAS_JSONSCHEMA = any(b is not None for b in (jsonschema_rs, fastjsonschema, Draft202012Validator))
+
+# A compiled validator is a cheap pass/fail check plus an error iterator
+# yielding (path, message); errors are only collected once the check fails
+SchemaErrors = Callable[[Dict[str, Any]], Iterator[Tuple[List[Any], str]]]
+CompiledSchema = Tuple[Callable[[Dict[str, Any]], bool], SchemaErrors]
 
 
 # -------------------------
 # Helpers
 # -------------------------
 
+# Per-build caches (keyed by resolved path)
+_JSON_CACHE: Dict[Path, Dict[str, Any]] = {}
+_VALIDATED: Set[Tuple[Path, Path, str]] = set()
+_VALIDATOR_CACHE: Dict[Path, CompiledSchema] = {}
+_PATH_EXISTS_CACHE: Dict[Path, bool] = {}
+_ASSET_PATH_CACHE: Dict[Tuple[Path, Path, str], Path] = {}
+_SCHOOL_INDEX: Dict[Path, Dict[str, Path]] = {}
+_JSON_DIGEST: Dict[Path, str] = {}
+# --watch only: (task_dir, index, points) -> (inputs key, rendered TeX)
+_FRAGMENT_CACHE: Dict[Tuple[Path, int, float], Tuple[Tuple[str, ...], bytes]] = {}
+
 def read_json(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+    key = path.resolve()
+    data = _JSON_CACHE.get(key)
+    if data is None:
+        raw = path.read_bytes()
+        data = json_loads(raw)
+        # Digest first: a thread that finds data in _JSON_CACHE may ask json_digest() right away
+        _JSON_DIGEST[key] = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        _JSON_CACHE[key] = data
+    return data
+
+def json_digest(path: Path) -> str:
+    # Content hash of a file already loaded through read_json
+    return _JSON_DIGEST[path.resolve()]
+
+def invalidate_inputs(changed: Iterable[Path]) -> None:
+    """Forget cached state for changed files (used by --watch between builds)."""
+    for p in changed:
+        key = p.resolve()
+        _JSON_CACHE.pop(key, None)
+        _JSON_DIGEST.pop(key, None)
+        _VALIDATOR_CACHE.pop(key, None)
+        # Drop validations by the old schema and of the old file contents
+        for seen in [v for v in _VALIDATED if key in (v[0], v[1])]:
+            _VALIDATED.discard(seen)
+    # Files may have been added, removed or moved
+    _PATH_EXISTS_CACHE.clear()
+    _ASSET_PATH_CACHE.clear()
+    _SCHOOL_INDEX.clear()
+
+def compile_validator(schema: Dict[str, Any]) -> CompiledSchema:
+    if jsonschema_rs is not None:
+        make = getattr(jsonschema_rs, "validator_for", None) or jsonschema_rs.JSONSchema
+        rs = make(schema)
+
+        def rs_errors(instance: Dict[str, Any]) -> Iterator[Tuple[List[Any], str]]:
+            for e in rs.iter_errors(instance):
+                yield list(e.instance_path), e.message
+        return rs.is_valid, rs_errors
+
+    if fastjsonschema is not None:
+        # use_default=False: validation must never write schema defaults into the instance
+        fast = fastjsonschema.compile(schema, use_default=False)
+
+        def fast_is_valid(instance: Dict[str, Any]) -> bool:
+            try:
+                fast(instance)
+            except fastjsonschema.JsonSchemaValueException:
+                return False
+            return True
+
+        def fast_errors(instance: Dict[str, Any]) -> Iterator[Tuple[List[Any], str]]:
+            # fastjsonschema stops at the first error; path starts with "data"
+            try:
+                fast(instance)
+            except fastjsonschema.JsonSchemaValueException as e:
+                yield list(e.path[1:]), e.message
+        return fast_is_valid, fast_errors
+
+    Draft202012Validator.check_schema(schema)
+    v = Draft202012Validator(schema)
 
-def validate_json(instance: Dict[str, Any], schema_path: Path, label: str) -> None:
+    def py_errors(instance: Dict[str, Any]) -> Iterator[Tuple[List[Any], str]]:
+        for e in v.iter_errors(instance):
+            yield list(e.path), e.message
+    return v.is_valid, py_errors
+
+def get_validator(schema_path: Path) -> CompiledSchema:
+    key = schema_path.resolve()
+    v = _VALIDATOR_CACHE.get(key)
+    if v is None:
+        v = compile_validator(read_json(schema_path))
+        _VALIDATOR_CACHE[key] = v
+    return v
+
+def schema_errors(
+    instance: Dict[str, Any],
+    schema_path: Path,
+    label: str,
+    source: Optional[Path] = None,
+) -> List[str]:
+    """Report lines for a failed validation (empty when valid); printing is left to the caller."""
     if not HAS_JSONSCHEMA:
-        return
-    schema = read_json(schema_path)
-    v = Draft202012Validator(schema)
-    errors = sorted(v.iter_errors(instance), key=lambda e: list(e.path))
-    if errors:
-        print(f"\n❌ Validation failed for {label}: {schema_path.name}")
-        for e in errors[:30]:
-            loc = ".".join([str(x) for x in e.path]) or "<root>"
-            print(f" - {loc}: {e.message}")
+        return []
+    # Remember passes by file contents; only when instance is what read_json(source) holds
+    seen_key = None
+    if source is not None:
+        src = source.resolve()
+        if _JSON_CACHE.get(src) is instance and src in _JSON_DIGEST:
+            seen_key = (schema_path.resolve(), src, _JSON_DIGEST[src])
+    if seen_key in _VALIDATED:
+        return []
+    is_valid, iter_errors = get_validator(schema_path)
+    if not is_valid(instance):
+        errors = sorted(iter_errors(instance), key=lambda e: e[0])
+        lines = [f"\n❌ Validation failed for {label}: {schema_path.name}"]
+        for path, message in errors[:30]:
+            loc = ".".join([str(x) for x in path]) or "<root>"
+            lines.append(f" - {loc}: {message}")
+        return lines
+    if seen_key is not None:
+        _VALIDATED.add(seen_key)
+    return []
+
+def validate_json(
+    instance: Dict[str, Any],
+    schema_path: Path,
+    label: str,
+    source: Optional[Path] = None,
+) -> None:
+    lines = schema_errors(instance, schema_path, label, source)
+    if lines:
+        print("\n".join(lines))
         raise SystemExit(2)
 
 def which(cmd: str) -> Optional[str]:
     from shutil import which as _which
     return _which(cmd)
 
+def path_exists(p: Path) -> bool:
+    # Inputs don't change during a build, so one stat() per path is enough
+    hit = _PATH_EXISTS_CACHE.get(p)
+    if hit is None:
+        hit = p.exists()
+        _PATH_EXISTS_CACHE[p] = hit
+    return hit
+
+def latex_command(compiler: str, outdir: Path, tex_path: Path, draft: bool = False) -> List[str]:
+    cmd = [compiler]
+    if draft:
+        # xelatex has no -draftmode; -no-pdf skips the xdvipdfmx stage instead
+        is_xelatex = Path(compiler).stem.lower() == "xelatex"
+        cmd.append("-no-pdf" if is_xelatex else "-draftmode")
+    cmd += [
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        "-file-line-error",
+        f"-output-directory={outdir.as_posix()}",
+        tex_path.as_posix(),
+    ]
+    return cmd
+
+def latexmk_command(latexmk: str, compiler: str, outdir: Path, tex_path: Path, force: bool = False) -> List[str]:
+    is_xelatex = Path(compiler).stem.lower() == "xelatex"
+    cmd = [latexmk, "-xelatex" if is_xelatex else "-pdf"]
+    if force:
+        # -g: run even if latexmk considers the PDF up to date
+        cmd.append("-g")
+    return cmd + [
+        "-synctex=0",
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        "-file-line-error",
+        f"-outdir={outdir.as_posix()}",
+        tex_path.as_posix(),
+    ]
+
+def build_fingerprint(tex: bytes, asset_files: Iterable[Path], compiler: str) -> Optional[str]:
+    # None means "can't fingerprint" (e.g. an image vanished) and counts as a cache miss
+    h = hashlib.blake2b(digest_size=20)
+    h.update(Path(compiler).name.encode("utf-8") + b"\0")
+    h.update(tex)
+    # Images are referenced by path only, so their size/mtime goes into the key too
+    for p in sorted(asset_files):
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        h.update(f"\0{p.as_posix()}\0{st.st_size}\0{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+def store_cached(data: bytes, dest: Path) -> None:
+    # Write to a temp file next to dest, then rename, so readers never see a partial file
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def prune_cached(keep: Path, exam_id: str) -> None:
+    # One cached PDF per exam: drop its older <exam_id>-<fingerprint>.pdf entries
+    for old in keep.parent.glob(f"{glob.escape(exam_id)}-*.pdf"):
+        fp = old.stem[len(exam_id) + 1:]
+        if old != keep and len(fp) == 40 and all(c in "0123456789abcdef" for c in fp):
+            old.unlink(missing_ok=True)
+
 def resolve_asset_path(project_root: Path, base_dir: Path, p: str) -> Path:
+    key = (project_root, base_dir, p)
+    hit = _ASSET_PATH_CACHE.get(key)
+    if hit is not None:
+        return hit
     cand = Path(p)
     if cand.is_absolute():
-        return cand
-    pr = project_root / cand
-    if pr.exists():
-        return pr
-    bd = base_dir / cand
-    return bd
+        res = cand
+    elif path_exists(project_root / cand):
+        res = project_root / cand
+    else:
+        res = base_dir / cand
+    _ASSET_PATH_CACHE[key] = res
+    return res
+
+def find_school(project_root: Path, school_id: str) -> Optional[Path]:
+    schools_dir = project_root / "schools"
+    # Usual layouts first: schools/<id>.json or schools/<id>/<id>.json
+    for cand in (schools_dir / f"{school_id}.json", schools_dir / school_id / f"{school_id}.json"):
+        if path_exists(cand):
+            return cand
+
+    # Otherwise walk schools/ once per project and look ids up by file stem
+    index = _SCHOOL_INDEX.get(project_root)
+    if index is None:
+        index = {}
+        for path in schools_dir.rglob("*.json"):
+            index.setdefault(path.stem, path)
+        _SCHOOL_INDEX[project_root] = index
+    return index.get(school_id)
+
+def load_task(
+    project_root: Path,
+    task_id: str,
+    schema_path: Optional[Path],
+) -> Tuple[Dict[str, Any], List[str]]:
+    # Runs on a worker thread: validation errors are returned, not printed
+    task_path = project_root / "tasks" / task_id / "task.json"
+    if not path_exists(task_path):
+        raise FileNotFoundError(f"Task JSON not found: {task_path}")
+    task = read_json(task_path)
+    errors = schema_errors(task, schema_path, f"task ({task_id})", task_path) if schema_path is not None else []
+    return task, errors
 
 def tex_escape_minimal(s: Any) -> str:
     # We assume most strings are already LaTeX-safe (math etc.)
-    return str(s).replace("\r\n", "\n")
+    if not isinstance(s, str):
+        s = str(s)
+    if "\r" not in s:
+        return s
+    return s.replace("\r\n", "\n")
 
 
 # -------------------------
 # LaTeX rendering
 # -------------------------
 
-def latex_preamble() -> str:
-    # XeLaTeX-friendly preamble (works with pdflatex too, but fontspec needs XeLaTeX/LuaLaTeX)
-    return r"""
+# XeLaTeX-friendly preamble (works with pdflatex too, but fontspec needs XeLaTeX/LuaLaTeX)
+_PREAMBLE = r"""
 \documentclass[12pt,a4paper]{article}
 \usepackage[margin=2cm]{geometry}
 \usepackage{graphicx}
@@ -93,8 +350,13 @@ def latex_preamble() -> str:
 \begin{document}
 """.lstrip()
 
+_END = r"\end{document}"
+
+def latex_preamble() -> str:
+    return _PREAMBLE
+
 def latex_end() -> str:
-    return r"\end{document}"
+    return _END
 
 
 def render_header_template(
@@ -105,13 +367,13 @@ def render_header_template(
     total_points: float,
 ) -> str:
     header_path = project_root / "templates" / "header.tex"
-    if not header_path.exists():
+    if not path_exists(header_path):
         raise FileNotFoundError(f"Header template not found: {header_path}")
 
     header = header_path.read_text(encoding="utf-8")
 
     logo_path = resolve_asset_path(project_root, school_base_dir, school["logo"])
-    if not logo_path.exists():
+    if not path_exists(logo_path):
         raise FileNotFoundError(f"School logo not found: {logo_path}")
 
     # Make points pretty
@@ -129,154 +391,209 @@ def render_header_template(
     return defs + "\n\n" + header + "\n"
 
 
-def render_workspace_block(block: Dict[str, Any]) -> str:
-    t = block["type"]
-
-    if t == "lines":
-        n = int(block["lines"])
-        # simple writing lines
-        lines = "\n".join([r"\linefield{16cm}\\[6pt]" for _ in range(n)])
-        return lines + "\n"
-
-    if t == "blank":
-        h = float(block["height_cm"])
-        return rf"\vspace{{{h}cm}}" + "\n"
-
-    if t == "box":
-        h = float(block["height_cm"])
-        title = tex_escape_minimal(block.get("box_title", ""))
-        if title.strip():
-            return rf"\textbf{{{title}}}\par\vspace{{2pt}}\fbox{{\parbox[t][{h}cm][t]{{\linewidth}}{{}}}}\n"
-        return rf"\fbox{{\parbox[t][{h}cm][t]{{\linewidth}}{{}}}}\n"
-
-    if t == "grid":
-        # IMPORTANT: TikZ cannot use \linewidth as a coordinate length directly.
-        # We draw using a fixed width that matches typical text width (~16cm with 2cm margins).
-        # Adjust GRID_WIDTH_CM if you change margins.
-        GRID_WIDTH_CM = 16.0
-
-        h = float(block.get("height_cm", 4.0))
-        grid = block.get("grid", "karo_5mm")
-
-        if grid == "karo_5mm":
-            step = "0.5cm"
-        elif grid == "karo_1cm":
-            step = "1cm"
-        elif grid == "millimeter":
-            step = "0.1cm"
-        else:
-            step = "0.5cm"
-
-        return rf"""
-\begin{{center}}
-\begin{{tikzpicture}}
-  \draw[step={step}, very thin] (0,0) grid ({GRID_WIDTH_CM}cm, {h}cm);
-  \draw[line width=0.4pt] (0,0) rectangle ({GRID_WIDTH_CM}cm, {h}cm);
-\end{{tikzpicture}}
-\end{{center}}
-""".lstrip()
+# IMPORTANT: TikZ cannot use \linewidth as a coordinate length directly.
+# We draw using a fixed width that matches typical text width (~16cm with 2cm margins).
+# Adjust GRID_WIDTH_CM if you change margins.
+GRID_WIDTH_CM = 16.0
+
+GRID_STEPS = {
+    "karo_5mm": "0.5cm",
+    "karo_1cm": "1cm",
+    "millimeter": "0.1cm",
+}
+
+# Workspace templates, built once at import (filled with %-formatting)
+_LINE = r"\linefield{16cm}\\[6pt]" + "\n"
+_BLANK_TMPL = r"\vspace{%scm}" + "\n"
+_BOX_TMPL = r"\fbox{\parbox[t][%scm][t]{\linewidth}{}}\n"
+_TITLED_BOX_TMPL = r"\textbf{%s}\par\vspace{2pt}" + _BOX_TMPL
+_GRID_TMPL = r"""\begin{center}
+\begin{tikzpicture}
+  \draw[step=%s, very thin] (0,0) grid (%scm, %scm);
+  \draw[line width=0.4pt] (0,0) rectangle (%scm, %scm);
+\end{tikzpicture}
+\end{center}
+"""
+
+def _render_lines(block: Dict[str, Any]) -> str:
+    # simple writing lines
+    return _LINE * int(block["lines"])
+
+def _render_blank(block: Dict[str, Any]) -> str:
+    return _BLANK_TMPL % float(block["height_cm"])
+
+def _render_box(block: Dict[str, Any]) -> str:
+    h = float(block["height_cm"])
+    title = tex_escape_minimal(block.get("box_title", ""))
+    if title.strip():
+        return _TITLED_BOX_TMPL % (title, h)
+    return _BOX_TMPL % h
+
+def _render_grid(block: Dict[str, Any]) -> str:
+    h = float(block.get("height_cm", 4.0))
+    step = GRID_STEPS.get(block.get("grid", "karo_5mm"), "0.5cm")
+    return _GRID_TMPL % (step, GRID_WIDTH_CM, h, GRID_WIDTH_CM, h)
+
+def _render_coord(block: Dict[str, Any]) -> str:
+    h = float(block.get("height_cm", 6.0))
+    return _GRID_TMPL % ("0.5cm", GRID_WIDTH_CM, h, GRID_WIDTH_CM, h)
+
+def _render_empty(block: Dict[str, Any]) -> str:
+    return ""
 
-    if t == "coord":
-        GRID_WIDTH_CM = 16.0
-        h = float(block.get("height_cm", 6.0))
-        return rf"""
-\begin{{center}}
-\begin{{tikzpicture}}
-  \draw[step=0.5cm, very thin] (0,0) grid ({GRID_WIDTH_CM}cm, {h}cm);
-  \draw[line width=0.4pt] (0,0) rectangle ({GRID_WIDTH_CM}cm, {h}cm);
-\end{{tikzpicture}}
-\end{{center}}
-""".lstrip()
+WORKSPACE_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "lines": _render_lines,
+    "blank": _render_blank,
+    "box": _render_box,
+    "grid": _render_grid,
+    "coord": _render_coord,
+}
+
+def render_workspace_block(block: Dict[str, Any]) -> str:
+    return WORKSPACE_RENDERERS.get(block["type"], _render_empty)(block)
 
-    return ""
 
+# Task parts: each workspace block is followed by a blank line
+_PARTS_BEGIN = r"\begin{enumerate}[label=\alph*)]" + "\n"
+_PART_TMPL = r"\item %s" + "\n%s"
+_PARTS_END = r"\end{enumerate}"
 
-def render_task(project_root: Path, task_dir: Path, task: Dict[str, Any], index: int) -> str:
+def rendered_assets(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The assets render_task actually includes: the layout image, or the figures."""
+    assets = task.get("assets", [])
+    if (task.get("render") or {}).get("mode", "text") == "layout":
+        for a in assets:
+            if a.get("role") == "layout":
+                return [a]
+        return assets[:1]
+    return [a for a in assets if a.get("role", "figure") == "figure"]
+
+def check_task_assets(task: Dict[str, Any], asset_paths: Iterable[Path]) -> None:
+    kind = "layout" if (task.get("render") or {}).get("mode", "text") == "layout" else "figure"
+    for p in asset_paths:
+        if not path_exists(p):
+            raise FileNotFoundError(f"Task {kind} asset not found: {p}")
+
+def render_task(
+    emit: Callable[[str], None],
+    project_root: Path,
+    task_dir: Path,
+    task: Dict[str, Any],
+    index: int,
+    points_override: Optional[float] = None,
+) -> None:
+    # emit() writes one line (it appends the newline itself)
     name = tex_escape_minimal(task["name"])
-    points = task["points"]
+    points = points_override if points_override is not None else task["points"]
     statement = tex_escape_minimal(task["statement"])
     mode = (task.get("render") or {}).get("mode", "text")
 
-    out: List[str] = []
-    out.append(rf"\tasktitle{{Aufgabe {index}: {name}}}{{{points}}}")
-    out.append(statement + "\n")
+    emit(rf"\tasktitle{{Aufgabe {index}: {name}}}{{{points}}}")
+    emit(statement + "\n")
 
-    assets = task.get("assets", [])
     workspace = task.get("workspace", [])
+    assets = rendered_assets(task)
+    asset_paths = {a["path"]: resolve_asset_path(project_root, task_dir, a["path"]) for a in assets}
+
+    check_task_assets(task, list(asset_paths.values()))
 
     # Layout mode: include a layout image big
     if mode == "layout":
-        layout_asset = None
-        for a in assets:
-            if a.get("role") == "layout":
-                layout_asset = a
-                break
-        if layout_asset is None and assets:
-            layout_asset = assets[0]
-
-        if not layout_asset:
+        if not assets:
             raise ValueError(f"Task {task['id']} is render.mode=layout but has no assets.")
 
-        p = resolve_asset_path(project_root, task_dir, layout_asset["path"])
-        if not p.exists():
-            raise FileNotFoundError(f"Task layout asset not found: {p}")
+        layout_asset = assets[0]
+        p = asset_paths[layout_asset["path"]]
 
         width = layout_asset.get("width", r"\linewidth")
-        out.append(rf"\begin{{center}}\includegraphics[width={width}]{{{p.as_posix()}}}\end{{center}}")
-        out.append("\n")
-        return "\n".join(out)
+        emit(rf"\begin{{center}}\includegraphics[width={width}]{{{p.as_posix()}}}\end{{center}}")
+        emit("\n")
+        return
 
     # Text mode: render figure assets
     for a in assets:
-        if a.get("role", "figure") != "figure":
-            continue
-        p = resolve_asset_path(project_root, task_dir, a["path"])
-        if not p.exists():
-            raise FileNotFoundError(f"Task figure asset not found: {p}")
+        p = asset_paths[a["path"]]
         width = a.get("width", r"0.8\linewidth")
         cap = a.get("caption")
         if cap:
-            out.append(
+            emit(
                 rf"\begin{{figure}}[H]\centering\includegraphics[width={width}]{{{p.as_posix()}}}\caption{{{tex_escape_minimal(cap)}}}\end{{figure}}"
             )
         else:
-            out.append(rf"\begin{{center}}\includegraphics[width={width}]{{{p.as_posix()}}}\end{{center}}")
+            emit(rf"\begin{{center}}\includegraphics[width={width}]{{{p.as_posix()}}}\end{{center}}")
 
-    # Parts
+    # Parts (the whole enumerate goes out in one write)
     parts = task.get("parts", [])
     if parts:
-        out.append(r"\begin{enumerate}[label=\alph*)]")
-        for part in parts:
-            out.append(r"\item " + tex_escape_minimal(part["text"]))
-            for wb in part.get("workspace", []):
-                out.append(render_workspace_block(wb))
-        out.append(r"\end{enumerate}")
+        emit(
+            _PARTS_BEGIN
+            + "".join(
+                _PART_TMPL % (
+                    tex_escape_minimal(part["text"]),
+                    "".join(render_workspace_block(wb) + "\n" for wb in part.get("workspace", [])),
+                )
+                for part in parts
+            )
+            + _PARTS_END
+        )
 
     # Workspace after task
     for wb in workspace:
-        out.append(render_workspace_block(wb))
+        emit(render_workspace_block(wb))
+
+    emit(r"\vspace{6pt}\hrule\vspace{6pt}")
+
 
-    out.append(r"\vspace{6pt}\hrule\vspace{6pt}")
-    return "\n".join(out)
+def line_writer(buf: io.BytesIO) -> Callable[[str], None]:
+    def emit(fragment: str) -> None:
+        buf.write(fragment.encode("utf-8"))
+        buf.write(b"\n")
+    return emit
+
+
+def cached_task_tex(
+    project_root: Path,
+    task_dir: Path,
+    task: Dict[str, Any],
+    index: int,
+    points: float,
+) -> bytes:
+    # Key: task.json content + the asset paths render_task resolves
+    asset_paths = [resolve_asset_path(project_root, task_dir, a["path"]) for a in rendered_assets(task)]
+    key = (json_digest(task_dir / "task.json"), *(p.as_posix() for p in asset_paths))
+    slot = (task_dir, index, points)
+    hit = _FRAGMENT_CACHE.get(slot)
+    if hit is not None and hit[0] == key:
+        # Still fail like render_task if an image went missing
+        check_task_assets(task, asset_paths)
+        return hit[1]
+
+    frag = io.BytesIO()
+    render_task(line_writer(frag), project_root, task_dir, task, index, points_override=points)
+    data = frag.getvalue()
+    _FRAGMENT_CACHE[slot] = (key, data)
+    return data
 
 
 # -------------------------
 # Main build
 # -------------------------
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("exam_json", type=str, help="Path to exams/<exam>.json")
-    ap.add_argument("--project-root", type=str, default=".", help="Project root (default: current dir)")
-    ap.add_argument("--outdir", type=str, default="out", help="Output directory (default: out/)")
-    ap.add_argument("--no-validate", action="store_true", help="Skip jsonschema validation")
-    args = ap.parse_args()
-
-    project_root = Path(args.project_root).resolve()
-    exam_path = Path(args.exam_json).resolve()
-    outdir = (project_root / args.outdir).resolve()
-    outdir.mkdir(parents=True, exist_ok=True)
-
+def build_one(
+    exam_path: Path,
+    project_root: Path,
+    outdir: Path,
+    validate: bool = True,
+    use_cache: bool = True,
+    quiet: bool = False,
+    reuse_fragments: bool = False,
+) -> Path:
+    """Build one exam into outdir and return the PDF path.
+
+    quiet=True discards the LaTeX console output (it still ends up in the .log),
+    which keeps concurrent batch builds readable. reuse_fragments=True keeps
+    rendered task TeX in memory between builds (for --watch).
+    """
     exam = read_json(exam_path)
 
     # Schemas
@@ -285,61 +602,79 @@ def main() -> None:
     school_schema = schemas_dir / "school.schema.json"
     exam_schema = schemas_dir / "exam.schema.json"
 
-    if not args.no_validate and HAS_JSONSCHEMA and exam_schema.exists():
-        validate_json(exam, exam_schema, f"exam ({exam_path.name})")
+    validate_on = validate and HAS_JSONSCHEMA
+    if validate_on and path_exists(exam_schema):
+        validate_json(exam, exam_schema, f"exam ({exam_path.name})", exam_path)
 
     # Load school
     school_id = exam["school_id"]
-    school_path = next((project_root / "schools").glob(f"**/{school_id}.json"), None)
-    if school_path is None or not school_path.exists():
+    school_path = find_school(project_root, school_id)
+    if school_path is None or not path_exists(school_path):
         raise FileNotFoundError(f"School file not found for id '{school_id}' inside schools/")
 
     school = read_json(school_path)
-    if not args.no_validate and HAS_JSONSCHEMA and school_schema.exists():
-        validate_json(school, school_schema, f"school ({school_path.name})")
+    if validate_on and path_exists(school_schema):
+        validate_json(school, school_schema, f"school ({school_path.name})", school_path)
 
     school_base_dir = school_path.parent
 
+    # Load + validate each distinct task once, in parallel (disk reads dominate)
+    validate_tasks = validate_on and path_exists(task_schema)
+    if validate_tasks:
+        get_validator(task_schema)  # compile up front instead of racing in the workers
+    task_ids = list(dict.fromkeys(tref["id"] for tref in exam["tasks"]))
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(task_ids)))) as pool:
+        futures = [
+            pool.submit(load_task, project_root, task_id, task_schema if validate_tasks else None)
+            for task_id in task_ids
+        ]
+        tasks_by_id: Dict[str, Dict[str, Any]] = {}
+        # Report in exam order and stop at the first failing task, as a sequential load would
+        for task_id, f in zip(task_ids, futures):
+            task, errors = f.result()
+            if errors:
+                print("\n".join(errors))
+                raise SystemExit(2)
+            tasks_by_id[task_id] = task
+
     # Precompute total points (so header can show it)
     total_points = 0.0
     for tref in exam["tasks"]:
-        task_id = tref["id"]
-        task_path = project_root / "tasks" / task_id / "task.json"
-        if not task_path.exists():
-            raise FileNotFoundError(f"Task JSON not found: {task_path}")
-        task = read_json(task_path)
+        task = tasks_by_id[tref["id"]]
         pts = float(tref.get("points_override", task["points"]))
         total_points += pts
 
     # Build LaTeX
-    tex_parts: List[str] = []
-    tex_parts.append(latex_preamble())
-    tex_parts.append(render_header_template(project_root, school_base_dir, exam, school, total_points))
+    # Fragments are encoded as they are emitted and written out in one go;
+    # each emit() ends a line
+    buf = io.BytesIO()
+    emit = line_writer(buf)
+
+    emit(latex_preamble())
+    emit(render_header_template(project_root, school_base_dir, exam, school, total_points))
 
     # Render tasks
     for i, tref in enumerate(exam["tasks"], start=1):
         task_id = tref["id"]
         task_dir = project_root / "tasks" / task_id
-        task_path = task_dir / "task.json"
-        task = read_json(task_path)
-
-        if not args.no_validate and HAS_JSONSCHEMA and task_schema.exists():
-            validate_json(task, task_schema, f"task ({task_id})")
+        task = tasks_by_id[task_id]
 
         pts = float(tref.get("points_override", task["points"]))
-        task_for_render = dict(task)
-        task_for_render["points"] = pts
 
-        if tref.get("page_break_before") or (task_for_render.get("render") or {}).get("page_break_before"):
-            tex_parts.append(r"\newpage")
+        if tref.get("page_break_before") or (task.get("render") or {}).get("page_break_before"):
+            emit(r"\newpage")
 
-        tex_parts.append(render_task(project_root, task_dir, task_for_render, i))
+        if reuse_fragments:
+            buf.write(cached_task_tex(project_root, task_dir, task, i, pts))
+        else:
+            render_task(emit, project_root, task_dir, task, i, points_override=pts)
 
-    tex_parts.append(latex_end())
+    buf.write(latex_end().encode("utf-8"))
+    tex_bytes = buf.getvalue()
 
     exam_id = exam["id"]
     tex_path = outdir / f"{exam_id}.tex"
-    tex_path.write_text("\n".join(tex_parts), encoding="utf-8")
+    tex_path.write_bytes(tex_bytes)
     print(f"✅ Wrote TeX: {tex_path}")
 
     # Compile (prefer xelatex for Unicode)
@@ -347,25 +682,272 @@ def main() -> None:
     if compiler is None:
         raise RuntimeError("Neither xelatex nor pdflatex found in PATH. Install MiKTeX/TeX Live and add to PATH.")
 
-    # Run twice for references
-    for _ in range(2):
-        cmd = [
-            compiler,
-            "-interaction=nonstopmode",
-            "-halt-on-error",
-            f"-output-directory={outdir.as_posix()}",
-            tex_path.as_posix(),
-        ]
+    pdf_path = outdir / f"{exam_id}.pdf"
+
+    # Identical TeX + unchanged images => identical PDF, so reuse a cached one
+    cached_pdf: Optional[Path] = None
+    if use_cache:
+        asset_files = {resolve_asset_path(project_root, school_base_dir, school["logo"])}
+        for task_id, task in tasks_by_id.items():
+            task_dir = project_root / "tasks" / task_id
+            asset_files.update(resolve_asset_path(project_root, task_dir, a["path"]) for a in rendered_assets(task))
+        fp = build_fingerprint(tex_bytes, asset_files, compiler)
+        if fp is not None:
+            cached_pdf = outdir / ".cache" / f"{exam_id}-{fp}.pdf"
+    if cached_pdf is not None and cached_pdf.exists():
+        shutil.copyfile(cached_pdf, pdf_path)
+        print(f"♻️ Inputs unchanged, reused cached PDF: {pdf_path}")
+        return pdf_path
+
+    latex_out = subprocess.DEVNULL if quiet else None
+
+    latexmk = which("latexmk")
+    if latexmk is not None:
+        # latexmk re-runs the compiler only until the .aux stops changing
+        cmd = latexmk_command(latexmk, compiler, outdir, tex_path, force=not use_cache)
         print("▶ Running:", " ".join(cmd))
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, stdout=latex_out)
+    else:
+        # Run twice for references; the first pass only needs the .aux, so skip PDF output
+        for draft in (True, False):
+            cmd = latex_command(compiler, outdir, tex_path, draft=draft)
+            print("▶ Running:", " ".join(cmd))
+            subprocess.run(cmd, check=True, stdout=latex_out)
 
-    pdf_path = outdir / f"{exam_id}.pdf"
     if pdf_path.exists():
+        if cached_pdf is not None:
+            store_cached(pdf_path.read_bytes(), cached_pdf)
+            prune_cached(cached_pdf, exam_id)
         print(f"🎉 PDF created: {pdf_path}")
     else:
         print("⚠️ Build finished but PDF not found. Check LaTeX logs.", file=sys.stderr)
         raise SystemExit(3)
+    return pdf_path
+
+
+def build_many(
+    exam_paths: List[Path],
+    project_root: Path,
+    outdir: Path,
+    validate: bool = True,
+    use_cache: bool = True,
+    jobs: int = 0,
+    reuse_fragments: bool = False,
+) -> None:
+    if len(exam_paths) == 1:
+        build_one(exam_paths[0], project_root, outdir, validate, use_cache, reuse_fragments=reuse_fragments)
+        return
+
+    # Exams sharing an id would compile onto the same outdir/<id>.* files at once
+    by_id: Dict[str, List[Path]] = {}
+    for p in exam_paths:
+        try:
+            by_id.setdefault(read_json(p)["id"], []).append(p)
+        except Exception:
+            pass  # unreadable exams are reported by their own build below
+    dupes = {exam_id: ps for exam_id, ps in by_id.items() if len(ps) > 1}
+    if dupes:
+        for exam_id, ps in dupes.items():
+            print(f"❌ Exam id '{exam_id}' is used by several files: {', '.join(p.name for p in ps)}", file=sys.stderr)
+        raise SystemExit(2)
+
+    # Each LaTeX run is single-threaded, so run several exams side by side;
+    # the worker threads just wait on their compiler subprocess
+    jobs = jobs or os.cpu_count() or 1
+    failed: List[Path] = []
+    with ThreadPoolExecutor(max_workers=min(jobs, len(exam_paths))) as pool:
+        futures = {
+            pool.submit(build_one, p, project_root, outdir, validate, use_cache, True, reuse_fragments): p
+            for p in exam_paths
+        }
+        for f in as_completed(futures):
+            try:
+                f.result()
+            except (Exception, SystemExit) as e:
+                print(f"❌ Build failed for {futures[f].name}: {type(e).__name__}: {e}", file=sys.stderr)
+                failed.append(futures[f])
+
+    if failed:
+        print(f"⚠️ {len(failed)} of {len(exam_paths)} exams failed.", file=sys.stderr)
+        raise SystemExit(1)
+
+
+# -------------------------
+# Watch mode
+# -------------------------
+
+# Files LaTeX/latexmk write next to <exam_id>.tex
+BUILD_ARTIFACT_SUFFIXES = {".tex", ".aux", ".log", ".pdf", ".out", ".toc", ".xdv", ".fls", ".fdb_latexmk"}
+
+def is_watched(p: Path, project_root: Path, outdir: Path) -> bool:
+    # Ignore build output and hidden files/dirs (.git, out/.cache, editor swap files, ...)
+    if project_root in outdir.parents:
+        # outdir is its own subtree (the default out/): skip all of it
+        if p == outdir or outdir in p.parents:
+            return False
+    elif p.parent == outdir and p.suffix in BUILD_ARTIFACT_SUFFIXES:
+        # outdir is the project root or outside it: skip only what the build writes there
+        return False
+    try:
+        parts = p.relative_to(project_root).parts
+    except ValueError:
+        parts = (p.name,)
+    return not any(part.startswith(".") for part in parts)
+
+def snapshot_inputs(project_root: Path, outdir: Path, extra: Iterable[Path]) -> Dict[Path, int]:
+    snap: Dict[Path, int] = {}
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        d = Path(dirpath)
+        dirnames[:] = [n for n in dirnames if is_watched(d / n, project_root, outdir)]
+        for n in filenames:
+            p = d / n
+            if is_watched(p, project_root, outdir):
+                try:
+                    snap[p] = p.stat().st_mtime_ns
+                except OSError:
+                    pass
+    for p in extra:
+        try:
+            snap[p] = p.stat().st_mtime_ns
+        except OSError:
+            pass
+    return snap
+
+
+class _ChangeCollector(FileSystemEventHandler):
+    def __init__(self, project_root: Path, outdir: Path) -> None:
+        super().__init__()
+        self.project_root = project_root
+        self.outdir = outdir
+        self.changed: Set[Path] = set()
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+
+    def on_any_event(self, event: Any) -> None:
+        # Newer watchdog also reports opened/closed; the build itself reads the inputs
+        if event.is_directory or event.event_type not in ("created", "modified", "moved", "deleted"):
+            return
+        for raw in (event.src_path, getattr(event, "dest_path", None)):
+            if not raw:
+                continue
+            p = Path(os.fsdecode(raw)).resolve()
+            if is_watched(p, self.project_root, self.outdir):
+                with self.lock:
+                    self.changed.add(p)
+                self.event.set()
+
+
+def iter_changes(
+    project_root: Path,
+    outdir: Path,
+    exam_paths: List[Path],
+    interval: float = 0.5,
+) -> Iterator[Set[Path]]:
+    """Yield the set of changed input files, once per burst of edits."""
+    snap = snapshot_inputs(project_root, outdir, exam_paths)
+
+    if Observer is not None:
+        collector = _ChangeCollector(project_root, outdir)
+        observer = Observer()
+        for d in {project_root, *(p.parent for p in exam_paths)}:
+            observer.schedule(collector, str(d), recursive=True)
+        observer.start()
+        try:
+            while True:
+                collector.event.wait()
+                time.sleep(interval)  # let editors finish writing
+                with collector.lock:
+                    candidates, collector.changed = collector.changed, set()
+                    collector.event.clear()
+                # Attribute-only events (e.g. atime after our own reads) don't count
+                changed = set()
+                for p in candidates:
+                    try:
+                        mtime: Optional[int] = p.stat().st_mtime_ns
+                    except OSError:
+                        mtime = None
+                    if snap.get(p) != mtime:
+                        changed.add(p)
+                        if mtime is None:
+                            snap.pop(p, None)
+                        else:
+                            snap[p] = mtime
+                if changed:
+                    yield changed
+        finally:
+            observer.stop()
+            observer.join()
+
+    # No watchdog: poll mtimes
+    while True:
+        time.sleep(interval)
+        new = snapshot_inputs(project_root, outdir, exam_paths)
+        changed = {p for p in snap.keys() | new.keys() if snap.get(p) != new.get(p)}
+        snap = new
+        if changed:
+            yield changed
+
+
+# -------------------------
+# CLI
+# -------------------------
+
+def non_negative_int(value: str) -> int:
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {n}")
+    return n
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("exam_json", type=str, nargs="+", help="Path(s) to exams/<exam>.json")
+    ap.add_argument("--project-root", type=str, default=".", help="Project root (default: current dir)")
+    ap.add_argument("--outdir", type=str, default="out", help="Output directory (default: out/)")
+    ap.add_argument("--no-validate", action="store_true", help="Skip jsonschema validation")
+    ap.add_argument("--no-cache", action="store_true", help="Always run LaTeX, ignore out/.cache")
+    ap.add_argument("--jobs", "-j", type=non_negative_int, default=0, help="Parallel builds for several exams (default: CPU count)")
+    ap.add_argument("--watch", action="store_true", help="Rebuild whenever an input file changes")
+    args = ap.parse_args()
+
+    project_root = Path(args.project_root).resolve()
+    exam_paths = list(dict.fromkeys(Path(p).resolve() for p in args.exam_json))
+    outdir = (project_root / args.outdir).resolve()
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    def build() -> None:
+        build_many(
+            exam_paths,
+            project_root,
+            outdir,
+            not args.no_validate,
+            not args.no_cache,
+            args.jobs,
+            reuse_fragments=args.watch and not args.no_cache,
+        )
+
+    if not args.watch:
+        build()
+        return
+
+    def rebuild() -> None:
+        # A broken edit should not end the watch loop
+        try:
+            build()
+        except (Exception, SystemExit) as e:
+            print(f"❌ Build failed: {type(e).__name__}: {e}", file=sys.stderr)
+        print("👀 Watching for changes (Ctrl+C to stop) ...")
+
+    # Unchanged exams and tasks come straight from the in-process and out/.cache
+    # caches, so a rebuild after an edit only re-renders what that edit touched
+    try:
+        rebuild()
+        for changed in iter_changes(project_root, outdir, exam_paths):
+            invalidate_inputs(changed)
+            print(f"🔄 {len(changed)} file(s) changed, rebuilding")
+            rebuild()
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()